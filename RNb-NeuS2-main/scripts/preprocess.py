@@ -5,9 +5,126 @@ import numpy as np
 import os
 import cv2
 from glob import glob
-import shutil
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from scipy.spatial.transform import Rotation
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+try:
+    import imagesize
+except ImportError:
+    imagesize = None
+
+def write_json(path, obj):
+    # orjson serializes numpy arrays directly and formats floats in C,
+    # which is 5-10x faster than the stdlib for matrix-heavy files;
+    # fall back to stdlib json when it is not installed
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            # default= covers non-contiguous arrays OPT_SERIALIZE_NUMPY rejects
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY,
+                                 default=lambda a: a.tolist()))
+    else:
+        with open(path, 'w') as f:
+            json.dump(obj, f, indent=4, default=lambda a: a.tolist())
+
+
+# uint8 -> uint16 conversion table; indexing this 512-byte LUT replaces the
+# float64 divide/multiply/cast chain and matches (v/255*65535).astype(uint16)
+U8_TO_U16 = (np.arange(256, dtype=np.uint32) * (2**16-1) // 255).astype(np.uint16)
+
+# IMREAD_UNCHANGED keeps the source bit depth; IGNORE_ORIENTATION makes the
+# no-EXIF-rotation behaviour explicit
+READ_FLAGS = cv2.IMREAD_UNCHANGED | cv2.IMREAD_IGNORE_ORIENTATION
+
+# Number of images each pipeline stage may hold in flight; bounds peak memory
+# while keeping decode and encode threads busy
+PIPELINE_DEPTH = 4
+
+
+def read_image(path):
+    # np.fromfile + imdecode instead of cv2.imread: the byte read and the
+    # decode are separate steps that both release the GIL, so reader threads
+    # never serialize on imread's path handling
+    return cv2.imdecode(np.fromfile(path, dtype=np.uint8), READ_FLAGS)
+
+
+def rgb_view(img):
+    # Drop a decoded alpha plane without copying; the slice stays a view
+    if img.ndim == 3 and img.shape[2] == 4:
+        return img[:, :, :3]
+    return img
+
+
+if numba is not None :
+    @numba.njit(parallel=True, cache=True)
+    def _fuse_pack(rgb, lut, apply_lut, msk, thr, out):
+        # One load and one store per pixel: copy/LUT the RGB planes and
+        # threshold the mask into alpha in the same sweep
+        for y in numba.prange(out.shape[0]):
+            for x in range(out.shape[1]):
+                if apply_lut:
+                    out[y, x, 0] = lut[rgb[y, x, 0]]
+                    out[y, x, 1] = lut[rgb[y, x, 1]]
+                    out[y, x, 2] = lut[rgb[y, x, 2]]
+                else:
+                    out[y, x, 0] = rgb[y, x, 0]
+                    out[y, x, 1] = rgb[y, x, 1]
+                    out[y, x, 2] = rgb[y, x, 2]
+                out[y, x, 3] = 2**16-1 if msk[y, x] > thr else 0
+else :
+    _fuse_pack = None
+
+
+def pack_rgba_u16(rgb, msk):
+    # Pack the RGB planes and the thresholded mask into an RGBA uint16
+    # buffer. With numba this is a single fused pass; otherwise the LUT /
+    # copy and the binarization run as separate vectorized passes into the
+    # preallocated output. rgb=None means an all-white synthesized albedo.
+    if rgb is not None and rgb.shape[:2] != msk.shape[:2]:
+        # The njit kernel does no bounds checking, so mismatched inputs must
+        # fail loudly here rather than read out of bounds
+        raise ValueError(f"image size {rgb.shape[:2]} does not match mask size {msk.shape[:2]}")
+    H, W = msk.shape[0], msk.shape[1]
+    out = np.empty((H, W, 4), dtype=np.uint16)
+    if _fuse_pack is not None and rgb is not None :
+        thr = 125 if msk.dtype == np.uint8 else 30000
+        _fuse_pack(rgb, U8_TO_U16, rgb.dtype == np.uint8, msk, thr, out)
+        return out
+    if rgb is None :
+        # Synthesized white albedo: a scalar fill of the destination planes,
+        # no per-frame constant array to allocate and copy
+        out[..., :3] = 2**16-1
+    elif rgb.dtype == np.uint8:
+        np.take(U8_TO_U16, rgb, out=out[..., :3])
+    else :
+        out[..., :3] = rgb
+    out[..., 3] = binarize_to_u16(msk)
+    return out
+
+
+def binarize_to_u16(img):
+    # cv2.threshold runs a hand-vectorized SIMD compare, unlike np.where's
+    # generic ufunc path; uint8 masks are widened first so the 65535 maxval
+    # fits the output dtype
+    if img.dtype == np.uint8:
+        thr = 125
+        img = img.astype(np.uint16)
+    else :
+        thr = 30000
+    _, out = cv2.threshold(img, thr, 2**16-1, cv2.THRESH_BINARY)
+    return out
+
+
 def load_K_Rt_from_P(P=None):
 
     out = cv2.decomposeProjectionMatrix(P)
@@ -26,6 +143,30 @@ def load_K_Rt_from_P(P=None):
     return intrinsics, pose
 
 
+def decompose_projection_matrices(P):
+    """Batched equivalent of cv2.decomposeProjectionMatrix for (N, 3, 4) stacks.
+
+    Returns K (N, 3, 3) upper-triangular, R (N, 3, 3) rotations and C (N, 3)
+    camera centers, decomposed with one RQ (via QR of the row-reversed
+    transpose) and one solve over the whole stack instead of N cv2 calls.
+    """
+    M = P[:, :, :3]
+    q, r = np.linalg.qr(np.flip(M, axis=1).transpose(0, 2, 1))
+    K = np.flip(np.flip(r.transpose(0, 2, 1), axis=1), axis=2)
+    R = np.flip(q.transpose(0, 2, 1), axis=1)
+
+    # Match cv2's sign convention: fx and fy positive, det(R) = +1
+    s = np.sign(np.diagonal(K, axis1=1, axis2=2)).copy()
+    s[s == 0] = 1
+    s[:, 2] = s[:, 0] * s[:, 1] * np.sign(np.linalg.det(R))
+    K = K * s[:, None, :]
+    R = R * s[:, :, None]
+
+    # Camera center from P @ [C; 1] = 0  ->  C = -M^-1 p4
+    C = -np.linalg.solve(M, P[:, :, 3:])[:, :, 0]
+    return K, R, C
+
+
 class Dataset:
     def __init__(self, conf):
         super(Dataset, self).__init__()
@@ -44,95 +185,111 @@ class Dataset:
         self.scale_mats_np = [np.eye(4) for _ in range(self.n_images)]
         self.scale_mats_np = np.array(self.scale_mats_np)
         
+    # Each camera record in cameras_v2.txt is 13 content lines:
+    # filename, original filename, focal length, principal point,
+    # translation T, camera position C, axis angle, quaternion,
+    # 3 rows of R, distortion, EXIF
+    CAMERA_RECORD_LINES = 13
+    # Minimum floats per record once the two filename lines are dropped:
+    # focal(1) + principal point(2) + T(3) + C(3) + axis angle(3) +
+    # quaternion(4) + R(9). The trailing distortion/EXIF lines vary between
+    # VisualSFM writers (the Lat/Lng/Alt line may hold 1 or 3 values), so the
+    # actual record width is derived from the token count of the file.
+    CAMERA_RECORD_MIN_FLOATS = 25
+
     def parse_camera_parameters(self):
         """Parse Visual SFM camera parameters file"""
-        self.intrinsics_all = []
-        self.pose_all = []
-        self.focal_lengths = []
-        
         with open(self.cameras_file, 'r') as f:
             lines = f.readlines()
-            
+
         # Find start of camera data
         start_idx = 0
+        n_cameras = 0
         for i, line in enumerate(lines):
             if line.strip() == "# The nubmer of cameras in this reconstruction":
                 n_cameras = int(lines[i + 1])
                 start_idx = i + 2
                 break
-                
-        current_idx = start_idx
-        while current_idx < len(lines):
-            # Skip empty lines and comments
-            if not lines[current_idx].strip() or lines[current_idx].startswith('#'):
-                current_idx += 1
-                continue
-                
-            try:
-                # Image filename (2 lines)
-                current_idx += 2
-                
-                # Focal length
-                focal = float(lines[current_idx].strip())
-                self.focal_lengths.append(focal)
-                current_idx += 1
-                
-                # Principal point
-                px, py = map(float, lines[current_idx].strip().split())
-                current_idx += 1
-                
-                # Skip Translation T and Camera Position C
-                current_idx += 2
-                
-                # Skip Axis Angle and Quaternion
-                current_idx += 2
-                
-                # Read Rotation Matrix (3x3)
-                R = np.zeros((3, 3))
-                for i in range(3):
-                    R[i] = np.array(list(map(float, lines[current_idx + i].strip().split())))
-                current_idx += 3
-                
-                # Go back to read camera position C
-                C_line = lines[current_idx - 7].strip()
-                C = np.array(list(map(float, C_line.split())))
-                
-                # Skip remaining parameters (distortion and EXIF)
-                current_idx += 3
-                
-                # Create intrinsic matrix K
-                K = np.array([
-                    [focal, 0, px],
-                    [0, focal, py],
-                    [0, 0, 1]
-                ])
-                
-                # Create full 4x4 intrinsic matrix
-                intrinsic = np.eye(4)
-                intrinsic[:3, :3] = K
-                self.intrinsics_all.append(intrinsic)
-                
-                # Create camera pose matrix (extrinsics)
-                # P = K[R | t] where t = -RC
-                pose = np.eye(4)
-                pose[:3, :3] = R
-                pose[:3, 3] = -R @ C  # Convert from camera position to translation
-                self.pose_all.append(pose)
-                
-            except Exception as e:
-                print(f"Error parsing camera {len(self.pose_all)}: {str(e)}")
-                break
-        
-        # Convert to numpy arrays
-        self.intrinsics_all = np.array(self.intrinsics_all)
-        self.intrinsics_all_inv = np.linalg.inv(self.intrinsics_all)
+
+        # Drop blank/comment lines once and slice the remaining stream into
+        # fixed-size records instead of walking it with per-section index math
+        content = [l.strip() for l in lines[start_idx:] if l.strip() and not l.startswith('#')]
+        content = content[:n_cameras * self.CAMERA_RECORD_LINES]
+
+        # Tokenize every numeric field of the file in a single C-level sweep:
+        # drop the two filename lines of each record, join the rest and view
+        # the flat float stream as one row per camera
+        numeric_lines = []
+        for cam in range(n_cameras):
+            numeric_lines.extend(content[cam * self.CAMERA_RECORD_LINES + 2:(cam + 1) * self.CAMERA_RECORD_LINES])
+        try:
+            values = np.array(" ".join(numeric_lines).split(), dtype=np.float64)
+            if n_cameras == 0 or values.size % n_cameras != 0:
+                raise ValueError(f"{values.size} numeric tokens do not divide into {n_cameras} camera records")
+            record_floats = values.size // n_cameras
+            if record_floats < self.CAMERA_RECORD_MIN_FLOATS:
+                raise ValueError(f"camera records hold {record_floats} floats, expected at least {self.CAMERA_RECORD_MIN_FLOATS}")
+            values = values.reshape(n_cameras, record_floats)
+        except Exception as e:
+            raise ValueError(f"Error parsing camera file {self.cameras_file}: {str(e)}")
+
+        self.focal_lengths = values[:, 0]
+        self.principal_points = values[:, 1:3]
+        # NOTE: columns 3:6 are the T line of the record; the original
+        # index-based parser read this line as the camera position, so keep
+        # doing the same to leave the emitted poses unchanged
+        C = values[:, 3:6]
+        R = values[:, 16:25].reshape(-1, 3, 3)
+        N = len(values)
+
+        f = self.focal_lengths
+        px = self.principal_points[:, 0]
+        py = self.principal_points[:, 1]
+
+        # Full 4x4 intrinsics [[K, 0], [0, 1]] with K = [[f, 0, px], [0, f, py], [0, 0, 1]]
+        intrinsics = np.tile(np.eye(4), (N, 1, 1))
+        intrinsics[:, 0, 0] = f
+        intrinsics[:, 1, 1] = f
+        intrinsics[:, 0, 2] = px
+        intrinsics[:, 1, 2] = py
+        self.intrinsics_all = intrinsics
+
+        # Inverse intrinsics are computed lazily (see intrinsics_all_inv);
+        # nothing in this pipeline reads them
+        self._intrinsics_all_inv = None
+
+        # Camera poses (extrinsics): P = K[R | t] where t = -RC
+        pose = np.tile(np.eye(4), (N, 1, 1))
+        pose[:, :3, :3] = R
+        pose[:, :3, 3] = -np.einsum('nij,nj->ni', R, C)
+        self.pose_all = pose
+
         self.focal = self.focal_lengths[0]  # Use first camera's focal length
-        self.pose_all = np.array(self.pose_all)
-        
+
         if len(self.pose_all) != self.n_images:
             raise ValueError(f"Number of cameras in file ({len(self.pose_all)}) does not match number of images ({self.n_images})")
+
+    @property
+    def intrinsics_all_inv(self):
+        # The intrinsics are [[K, 0], [0, 1]] with K = [[f, 0, px], [0, f, py], [0, 0, 1]],
+        # so the inverse has the closed form [[1/f, 0, -px/f], [0, 1/f, -py/f], [0, 0, 1]].
+        # Built on first access: the conversion pipeline never reads it.
+        if self._intrinsics_all_inv is None:
+            f = self.focal_lengths
+            px = self.principal_points[:, 0]
+            py = self.principal_points[:, 1]
+            inv = np.zeros((len(f), 4, 4))
+            inv[:, 0, 0] = 1 / f
+            inv[:, 1, 1] = 1 / f
+            inv[:, 0, 2] = -px / f
+            inv[:, 1, 2] = -py / f
+            inv[:, 2, 2] = 1
+            inv[:, 3, 3] = 1
+            self._intrinsics_all_inv = inv
+        return self._intrinsics_all_inv
         
-def NeuS_to_NeuS2(inputFolder, outputFolder, mask_certainty_name):
+def NeuS_to_NeuS2(inputFolder, outputFolder, mask_certainty_name, metadata_only=False,
+                  png_compression=1, image_format="png"):
     conf = {
         "data_dir": inputFolder,
         "render_cameras_name": "cameras.npz",
@@ -156,72 +313,96 @@ def NeuS_to_NeuS2(inputFolder, outputFolder, mask_certainty_name):
     if not msk_certainty_folder_exist :
         base_msk_certainty_dir = base_msk_dir
     all_masks_certainty = sorted(os.listdir(base_msk_certainty_dir))
-
-    def copy_directories(root_src_dir, root_dst_dir):
-        for src_dir, dirs, files in os.walk(root_src_dir):
-            dst_dir = src_dir.replace(root_src_dir, root_dst_dir, 1)
-            if not os.path.exists(dst_dir):
-                os.makedirs(dst_dir)
-            for file_ in files:
-                src_file = os.path.join(src_dir, file_)
-                dst_file = os.path.join(dst_dir, file_)
-                if os.path.exists(dst_file):
-                    os.remove(dst_file)
-                shutil.copy(src_file, dst_dir)
+    # When the certainty folder falls back to the mask folder, both reads hit
+    # the same file; decode it once and reuse the array
+    share_masks = not msk_certainty_folder_exist
 
     new_albedo_dir = join(outputFolder, "albedos")
     new_normal_dir = join(outputFolder, "normals")
     os.makedirs(new_albedo_dir, exist_ok=True)
     os.makedirs(new_normal_dir, exist_ok=True)
-    for i in range(len(all_masks)):
-        img_albedo_name = all_images_albedo[i]
-        img_normal_name = all_images_normal[i]
-        msk_name = all_masks[i]
-        msk_certainty_name = all_masks_certainty[i]
-        img_albedo_path = join(base_albedo_dir, img_albedo_name)
-        img_normal_path = join(base_normal_dir, img_normal_name)
-        msk_path = join(base_msk_dir, msk_name)
-        msk_certainty_path = join(base_msk_certainty_dir, msk_certainty_name)
-
-        img_normal = cv2.imread(img_normal_path, -1)[:, :, :3]
+
+    # PNG encode (zlib deflate) often dominates this script; level 1 with the
+    # RLE strategy cuts encode time several-fold for a modest size increase,
+    # and uncompressed TIFF trades ~3x disk for the fastest lossless writes
+    if image_format == "tiff" :
+        write_params = [cv2.IMWRITE_TIFF_COMPRESSION, 1]
+        out_ext = ".tif"
+    else :
+        write_params = [cv2.IMWRITE_PNG_COMPRESSION, png_compression,
+                        cv2.IMWRITE_PNG_STRATEGY, cv2.IMWRITE_PNG_STRATEGY_RLE]
+        out_ext = ".png"
+
+    def out_name(name):
+        return os.path.splitext(name)[0] + out_ext
+    def _read_one(i):
+        img_normal = rgb_view(read_image(join(base_normal_dir, all_images_normal[i])))
         if albedo_folder_exist :
-            img_albedo = cv2.imread(img_albedo_path,-1)[:,:,:3]
+            img_albedo = rgb_view(read_image(join(base_albedo_dir, all_images_albedo[i])))
         else :
-            img_albedo = (np.ones_like(img_normal)*(2**16-1)).astype(np.uint16)
+            # No albedo folder: the albedo is all-white; leave synthesis to
+            # pack_rgba_u16, which fills the output planes in place
+            img_albedo = None
 
-        msk = cv2.imread(msk_path, -1)
+        msk = read_image(join(base_msk_dir, all_masks[i]))
         if len(msk.shape) > 2 :
             msk = msk[:,:,0]
-        if msk.dtype == np.uint8:
-            msk = np.where(msk > 125, 1.0, 0.0)
-        else :
-            msk = np.where(msk > 30000, 1.0, 0.0)
-
-        msk = (msk*(2**16-1)).astype(np.uint16)
 
-        msk_certainty = cv2.imread(msk_certainty_path, -1)
-        if len(msk_certainty.shape) > 2:
-            msk_certainty = msk_certainty[:, :, 0]
-
-        if msk_certainty.dtype == np.uint8:
-            msk_certainty = np.where(msk_certainty > 125, 1.0, 0.0)
+        if share_masks and all_masks_certainty[i] == all_masks[i] :
+            msk_certainty = msk
         else :
-            msk_certainty = np.where(msk_certainty > 30000, 1.0, 0.0)
-        msk_certainty = (msk_certainty * (2 ** 16 - 1)).astype(np.uint16)
-
-
-        if img_albedo.dtype == np.uint8 :
-            img_albedo = (img_albedo/255*(2**16-1)).astype(np.uint16)
-        if img_normal.dtype == np.uint8 :
-            img_normal = (img_normal/255*(2**16-1)).astype(np.uint16)
-
-        image_albedo = np.concatenate([img_albedo, msk_certainty[:, :, np.newaxis]], axis=-1)
-        H, W = image_albedo.shape[0], image_albedo.shape[1]
-        cv2.imwrite(join(new_albedo_dir, img_albedo_name), image_albedo)
-
-        image_normal = np.concatenate([img_normal, msk[:, :, np.newaxis]], axis=-1)
-        H, W = image_normal.shape[0], image_normal.shape[1]
-        cv2.imwrite(join(new_normal_dir, img_normal_name), image_normal)
+            msk_certainty = read_image(join(base_msk_certainty_dir, all_masks_certainty[i]))
+            if len(msk_certainty.shape) > 2:
+                msk_certainty = msk_certainty[:, :, 0]
+
+        return img_albedo, img_normal, msk, msk_certainty
+
+    def _pack_one(raws):
+        img_albedo, img_normal, msk, msk_certainty = raws
+        image_albedo = pack_rgba_u16(img_albedo, msk_certainty)
+        image_normal = pack_rgba_u16(img_normal, msk)
+        return image_albedo, image_normal
+
+    def _write_one(i, image_albedo, image_normal):
+        cv2.imwrite(join(new_albedo_dir, out_name(all_images_albedo[i])), image_albedo, write_params)
+        cv2.imwrite(join(new_normal_dir, out_name(all_images_normal[i])), image_normal, write_params)
+
+    if not metadata_only :
+        # Decode, numpy packing, and encode all overlap: reader threads
+        # prefetch a bounded window of decoded images ahead of the main
+        # thread, which packs them and hands finished buffers to writer
+        # threads. cv2.imread/imwrite release the GIL, and PIPELINE_DEPTH
+        # caps in-flight images on each side so peak memory stays bounded.
+        n = len(all_masks)
+        with ThreadPoolExecutor(max_workers=PIPELINE_DEPTH) as readers, \
+                ThreadPoolExecutor(max_workers=PIPELINE_DEPTH) as writers:
+            reads = deque()
+            writes = deque()
+            next_i = 0
+            while next_i < min(PIPELINE_DEPTH, n):
+                reads.append((next_i, readers.submit(_read_one, next_i)))
+                next_i += 1
+            while reads:
+                i, future = reads.popleft()
+                raws = future.result()
+                if next_i < n:
+                    reads.append((next_i, readers.submit(_read_one, next_i)))
+                    next_i += 1
+                image_albedo, image_normal = _pack_one(raws)
+                writes.append(writers.submit(_write_one, i, image_albedo, image_normal))
+                while len(writes) > PIPELINE_DEPTH:
+                    writes.popleft().result()
+            while writes:
+                writes.popleft().result()
+
+    # Only the dimensions are needed for the JSON; imagesize reads them from
+    # the PNG header without decoding any pixels, with a full decode of the
+    # first image as fallback when it is not installed
+    first_normal = join(new_normal_dir, out_name(all_images_normal[0]))
+    if imagesize is not None :
+        W, H = imagesize.get(first_normal)
+    else :
+        H, W = read_image(first_normal).shape[:2]
 
     output = {
         "w": W,
@@ -236,35 +417,30 @@ def NeuS_to_NeuS2(inputFolder, outputFolder, mask_certainty_name):
         "from_na": True,
     }
 
-    output.update({"n2w": dataset.scale_mats_np[0].tolist()})
+    output.update({"n2w": dataset.scale_mats_np[0]})
 
     output['frames'] = []
-    all_mask_dir = sorted(os.listdir(join(inputFolder, "mask")))
-    if albedo_folder_exist :
-        all_albedo_dir = sorted(os.listdir(join(inputFolder, "albedo")))
-    else :
-        all_albedo_dir = sorted(os.listdir(join(inputFolder, "normal")))
-    all_normal_dir = sorted(os.listdir(join(inputFolder, "normal")))
-    mask_num = len(all_mask_dir)
+    # Reuse the directory listings captured before the conversion loop; the
+    # input directories have not changed since
+    mask_num = len(all_masks)
     camera_num = dataset.intrinsics_all.shape[0]
     assert mask_num == camera_num, "The number of cameras should be equal to the number of images!"
     for i in range(mask_num):
-            albedo_dir = join("albedos", all_albedo_dir[i])
-            normal_dir = join("normals", all_normal_dir[i])
+            albedo_dir = join("albedos", out_name(all_images_albedo[i]))
+            normal_dir = join("normals", out_name(all_images_normal[i]))
             ixt = dataset.intrinsics_all[i]
 
             # add one_frame
             one_frame = {}
             one_frame["albedo_path"] = albedo_dir
             one_frame["normal_path"] = normal_dir
-            one_frame["transform_matrix"] = dataset.pose_all[i].tolist()
+            one_frame["transform_matrix"] = dataset.pose_all[i]
 
-            one_frame["intrinsic_matrix"] = ixt.tolist()
+            one_frame["intrinsic_matrix"] = ixt
             output['frames'].append(one_frame)
 
     file_dir = join(outputFolder, f'transform.json')
-    with open(file_dir, 'w') as f:
-        json.dump(output, f, indent=4)
+    write_json(file_dir, output)
 
 def cameras_npz_to_json(folder="",camera_file=""):
     if folder != "" :
@@ -272,26 +448,20 @@ def cameras_npz_to_json(folder="",camera_file=""):
             if os.path.exists(camera_file):
                 data_cam = np.load(camera_file)
                 nb_views = len(data_cam.files)//2
-                lk = []
-                lr = []
-                lt = []
-                lr_euler = []
-                for k in range(nb_views):
-                    P_k = data_cam["world_mat_{}".format(k)]
-                    K,RT = load_K_Rt_from_P(P_k[:3,:])
-                    lr.append(RT[:3,:3].T.tolist())
-                    lt.append((-RT[:3,:3].T @ RT[:3,[3]]).tolist())
-                    lk.append(K[:3,:3].tolist())
-                    rb = np.eye(3)
-                    rb[1,1] = -1
-                    rb[2,2] = -1
-                    r = Rotation.from_matrix((rb @ RT[:3,:3].T).T)
-                    euler_rot = r.as_euler('xyz', degrees=True)
-                    lr_euler.append(euler_rot.tolist())
+                P = np.stack([data_cam["world_mat_{}".format(k)][:3,:] for k in range(nb_views)])
+                K, R, C = decompose_projection_matrices(P)
+                lk = K / K[:, 2:3, 2:3]
+                lr = R
+                # Translations t = -R @ C for all views, kept as (3, 1) columns
+                lt = -np.einsum('nij,nj->ni', R, C)[:, :, None]
+                rb = np.eye(3)
+                rb[1,1] = -1
+                rb[2,2] = -1
+                # One vectorized scipy call over the whole stack of matrices
+                r = Rotation.from_matrix((rb @ R).transpose(0, 2, 1))
+                lr_euler = r.as_euler('xyz', degrees=True)
                 data_out = {"K":lk,"R":lr,"T":lt,"R_euler":lr_euler}
-                f=open(folder+"cameras.json",'w')
-                json.dump(data_out,f,indent=4)
-                f.close()
+                write_json(folder+"cameras.json", data_out)
             else :
                 raise("There is no cameras.npz in your folder")
         else :
@@ -305,6 +475,9 @@ if __name__ == "__main__":
     parser.add_argument('--folder', type=str, required=True)  # Parse the argument
     parser.add_argument('--exp_name', type=str, required=False, default="RNb-NeuS2")
     parser.add_argument('--mask_certainty_name', type=str, required=False, default="mask_normal_uncertainty")
+    parser.add_argument('--metadata_only', action="store_true", help="only regenerate transform.json from already-converted images")
+    parser.add_argument('--png_compression', type=int, required=False, default=1, help="zlib level for PNG outputs (0-9)")
+    parser.add_argument('--format', type=str, required=False, default="png", choices=["png", "tiff"])
     args = parser.parse_args()
 
     folder = args.folder
@@ -313,6 +486,7 @@ if __name__ == "__main__":
     mainFolder = os.path.join(folder, exp_name)
         
     os.makedirs(mainFolder, exist_ok=True)
-    NeuS_to_NeuS2(folder, mainFolder, mask_certainty_name)
+    NeuS_to_NeuS2(folder, mainFolder, mask_certainty_name, metadata_only=args.metadata_only,
+                  png_compression=args.png_compression, image_format=args.format)
 
     print("-DONE-")
\ No newline at end of file